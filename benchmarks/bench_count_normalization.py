@@ -0,0 +1,124 @@
+"""
+Benchmark normalisasi jumlah likes/replies pada halaman response /youtubei/v1/next.
+
+Membandingkan normalize_count_value versi lama (re.search per komentar, hanya
+sufiks K/M/B) dengan versi cache + locale di youtube_comments.py, baik di dalam
+parse_comment_response maupun untuk normalisasi saja.
+
+Pemakaian:
+    python benchmarks/bench_count_normalization.py [fixture.json ...]
+
+Format fixture: {"hl": "<bahasa>", "pages": [<response JSON /youtubei/v1/next>, ...]}.
+Tanpa argumen, semua file di benchmarks/fixtures/ dipakai.
+"""
+import glob
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import youtube_comments  # noqa: E402
+
+FIXTURE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+ROUNDS = 200
+
+
+def legacy_normalize_count_value(value, hl=None):
+    """Implementasi sebelum cache/locale, disalin apa adanya sebagai baseline"""
+    if value is None:
+        return "0"
+    text = str(value).strip()
+    if not text:
+        return "0"
+    text = text.replace("\u202f", "").replace(",", "")
+    suffix = text[-1].upper()
+    multipliers = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+    if suffix in multipliers and text[:-1]:
+        try:
+            return str(int(float(text[:-1]) * multipliers[suffix]))
+        except ValueError:
+            pass
+    match = re.search(r"\d+", text)
+    if match:
+        return match.group(0)
+    return text
+
+
+def load_fixtures(paths):
+    fixtures = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            fixture = json.load(f)
+        fixtures.append((os.path.basename(path), fixture.get("hl", "en"), fixture["pages"]))
+    return fixtures
+
+
+def parse_pages(pages, hl):
+    total = 0
+    seen_ids = set()
+    entities = {}
+    for data in pages:
+        entities.update(youtube_comments.extract_comment_entities(data.get("frameworkUpdates")))
+        total += len(youtube_comments.parse_comment_response(data, entities, total, seen_ids, hl))
+    return total
+
+
+def record_raw_values(pages, hl):
+    """Kumpulkan teks mentah yang masuk ke normalize_count_value selama parsing"""
+    raw_values = []
+    original = youtube_comments.normalize_count_value
+
+    def recorder(value, hl=youtube_comments.DEFAULT_COUNT_LOCALE):
+        raw_values.append((value, hl))
+        return original(value, hl)
+
+    youtube_comments.normalize_count_value = recorder
+    try:
+        parse_pages(pages, hl)
+    finally:
+        youtube_comments.normalize_count_value = original
+    return raw_values
+
+
+def time_parse(pages, hl, normalizer):
+    original = youtube_comments.normalize_count_value
+    youtube_comments.normalize_count_value = normalizer
+    try:
+        return timeit.timeit(lambda: parse_pages(pages, hl), number=ROUNDS)
+    finally:
+        youtube_comments.normalize_count_value = original
+
+
+def main(argv):
+    paths = argv or sorted(glob.glob(os.path.join(FIXTURE_FOLDER, "*.json")))
+    if not paths:
+        print("❌ Tidak ada fixture")
+        return 1
+
+    print(f"{'fixture':<28} {'komentar':>8} {'mode':<8} {'normalize/komentar':>19} {'parse/komentar':>15}")
+    for name, hl, pages in load_fixtures(paths):
+        comments = parse_pages(pages, hl)
+        raw_values = record_raw_values(pages, hl)
+        youtube_comments._parse_count_text.cache_clear()
+        for mode, normalizer in (
+            ("lama", legacy_normalize_count_value),
+            ("cache", youtube_comments.normalize_count_value),
+        ):
+            normalize_seconds = timeit.timeit(
+                lambda: [normalizer(value, value_hl) for value, value_hl in raw_values], number=ROUNDS
+            )
+            parse_seconds = time_parse(pages, hl, normalizer)
+            per_comment = ROUNDS * comments
+            print(
+                f"{name:<28} {comments:>8} {mode:<8} "
+                f"{normalize_seconds / per_comment * 1e6:>16.3f} µs "
+                f"{parse_seconds / per_comment * 1e6:>12.3f} µs"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,347 @@
+import glob
+import json
+import os
+import re
+import sqlite3
+
+# Index disimpan di dalam folder output agar ikut berpindah bersama korpusnya
+DEFAULT_OUTPUT_FOLDER = "output"
+DEFAULT_INDEX_PATH = os.path.join(DEFAULT_OUTPUT_FOLDER, "comment_index.db")
+MAX_TERM_LENGTH = 64
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    video_id TEXT
+);
+CREATE TABLE IF NOT EXISTS comments (
+    doc_id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    comment_key TEXT NOT NULL,
+    comment_id TEXT,
+    author TEXT,
+    text TEXT,
+    published TEXT,
+    likes INTEGER NOT NULL,
+    replies_count INTEGER NOT NULL,
+    video_title TEXT,
+    source_path TEXT,
+    UNIQUE (video_id, comment_key)
+);
+CREATE INDEX IF NOT EXISTS comments_source_idx ON comments (source_path);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    likes INTEGER NOT NULL,
+    doc_id INTEGER NOT NULL,
+    PRIMARY KEY (term, likes, doc_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY,
+    df INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def tokenize(text):
+    """Pecah teks menjadi term unik (lowercase, unicode-aware)"""
+    if not text:
+        return set()
+    return {
+        token for token in TOKEN_PATTERN.findall(str(text).lower())
+        if len(token) <= MAX_TERM_LENGTH
+    }
+
+
+def _as_int(value):
+    """Likes/replies dari output lama berupa string angka, yang baru sudah integer"""
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return 0
+
+
+def open_index(index_path=DEFAULT_INDEX_PATH):
+    """Buka (atau buat) database index komentar"""
+    folder = os.path.dirname(index_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    conn = sqlite3.connect(index_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(files)")}
+    if "video_id" not in columns:
+        # Index lama belum mencatat video_id per file: baca ulang semua file sekali
+        with conn:
+            conn.execute("ALTER TABLE files ADD COLUMN video_id TEXT")
+            conn.execute("DELETE FROM files")
+    return conn
+
+
+def _doc_terms(author, text):
+    return tokenize(author) | tokenize(text)
+
+
+def _add_postings(conn, doc_id, likes, terms):
+    conn.executemany(
+        "INSERT OR IGNORE INTO postings (term, likes, doc_id) VALUES (?, ?, ?)",
+        [(term, likes, doc_id) for term in terms],
+    )
+    conn.executemany(
+        "INSERT INTO terms (term, df) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1",
+        [(term,) for term in terms],
+    )
+
+
+def _remove_postings(conn, doc_id, likes, terms):
+    conn.executemany(
+        "DELETE FROM postings WHERE term = ? AND likes = ? AND doc_id = ?",
+        [(term, likes, doc_id) for term in terms],
+    )
+    conn.executemany("UPDATE terms SET df = df - 1 WHERE term = ?", [(term,) for term in terms])
+
+
+def _index_comment(conn, comment, video_id, video_title, source_path):
+    text = (comment.get("text") or "").strip()
+    author = comment.get("author") or "Unknown"
+    if not text:
+        return False
+    comment_id = comment.get("comment_id")
+    # Sama dengan dedupe_key saat scraping
+    comment_key = comment_id or f"{author}::{text}"
+    likes = _as_int(comment.get("likes"))
+    replies_count = _as_int(comment.get("replies_count"))
+
+    existing = conn.execute(
+        "SELECT doc_id, author, text, likes FROM comments WHERE video_id = ? AND comment_key = ?",
+        (video_id, comment_key),
+    ).fetchone()
+    if existing:
+        doc_id = existing["doc_id"]
+        _remove_postings(conn, doc_id, existing["likes"], _doc_terms(existing["author"], existing["text"]))
+        conn.execute(
+            """UPDATE comments SET comment_id = ?, author = ?, text = ?, published = ?, likes = ?,
+                   replies_count = ?, video_title = ?, source_path = ?
+               WHERE doc_id = ?""",
+            (comment_id, author, text, comment.get("published"), likes,
+             replies_count, video_title, source_path, doc_id),
+        )
+    else:
+        cursor = conn.execute(
+            """INSERT INTO comments (video_id, comment_key, comment_id, author, text, published,
+                   likes, replies_count, video_title, source_path)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (video_id, comment_key, comment_id, author, text, comment.get("published"),
+             likes, replies_count, video_title, source_path),
+        )
+        doc_id = cursor.lastrowid
+    _add_postings(conn, doc_id, likes, _doc_terms(author, text))
+    return True
+
+
+def _remove_source(conn, path):
+    """Hapus komentar (beserta postings) yang terakhir di-index dari file `path`"""
+    rows = conn.execute(
+        "SELECT doc_id, author, text, likes FROM comments WHERE source_path = ?", (path,)
+    ).fetchall()
+    for row in rows:
+        _remove_postings(conn, row["doc_id"], row["likes"], _doc_terms(row["author"], row["text"]))
+    conn.execute("DELETE FROM comments WHERE source_path = ?", (path,))
+    conn.execute("DELETE FROM files WHERE path = ?", (path,))
+    return len(rows)
+
+
+def _purge_stale_files(conn, stats):
+    """
+    File yang sudah dihapus/dipindah atau berubah isinya dikeluarkan dari index.
+    Semua export lain untuk video yang sama ikut di-index ulang (di folder mana pun,
+    karena folder berubah jika judul video berubah), sebab komentar yang sama di
+    file lama sebelumnya tertimpa oleh file yang dikeluarkan.
+    """
+    known_files = conn.execute("SELECT path, mtime, size, video_id FROM files").fetchall()
+    affected_videos = set()
+    with conn:
+        for row in known_files:
+            path = row["path"]
+            try:
+                stat = os.stat(path)
+            except OSError:
+                stats["files_removed"] += 1
+                print(f"  🗑️  {path}: file tidak ada lagi, dikeluarkan dari index")
+            else:
+                if row["mtime"] == stat.st_mtime and row["size"] == stat.st_size:
+                    continue
+            affected_videos.add(row["video_id"])
+            affected_videos.update(
+                video_id for (video_id,) in conn.execute(
+                    "SELECT DISTINCT video_id FROM comments WHERE source_path = ?", (path,)
+                )
+            )
+            stats["comments_removed"] += _remove_source(conn, path)
+        conn.executemany(
+            "DELETE FROM files WHERE video_id = ?", [(video_id,) for video_id in affected_videos]
+        )
+
+
+def find_output_files(output_folder=DEFAULT_OUTPUT_FOLDER):
+    """Daftar file JSON hasil save_outputs, urut dari yang paling lama"""
+    pattern = os.path.join(output_folder, "*", "comments_*.json")
+    files = []
+    for path in glob.glob(pattern):
+        try:
+            files.append((os.path.getmtime(path), path))
+        except OSError:
+            # File dihapus/dipindah saat scan berlangsung
+            continue
+    return [path for _, path in sorted(files)]
+
+
+def update_index(conn, output_folder=DEFAULT_OUTPUT_FOLDER):
+    """
+    Index incremental: hanya file JSON baru/berubah yang dibaca ulang.
+    File yang lebih baru menimpa data komentar yang sama (video_id + comment_id).
+    Komentar dari file yang sudah dihapus/dipindah ikut dihapus dari index.
+    """
+    stats = {
+        "files_scanned": 0,
+        "files_indexed": 0,
+        "comments_indexed": 0,
+        "files_removed": 0,
+        "comments_removed": 0,
+    }
+    _purge_stale_files(conn, stats)
+    for path in find_output_files(output_folder):
+        stats["files_scanned"] += 1
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            print(f"⚠️  Gagal membaca {path}: {e}")
+            continue
+        known = conn.execute("SELECT mtime, size FROM files WHERE path = ?", (path,)).fetchone()
+        if known and known["mtime"] == stat.st_mtime and known["size"] == stat.st_size:
+            continue
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Gagal membaca {path}: {e}")
+            continue
+
+        video_id = result.get("video_id") or "unknown"
+        video_title = result.get("video_title")
+        count = 0
+        with conn:
+            for comment in result.get("comments", []):
+                if _index_comment(conn, comment, video_id, video_title, path):
+                    count += 1
+            conn.execute(
+                "INSERT OR REPLACE INTO files (path, mtime, size, video_id) VALUES (?, ?, ?, ?)",
+                (path, stat.st_mtime, stat.st_size, video_id),
+            )
+        stats["files_indexed"] += 1
+        stats["comments_indexed"] += count
+        print(f"  📥 {os.path.relpath(path, output_folder)}: {count:,} komentar")
+    return stats
+
+
+def search_comments(conn, query, limit=20):
+    """
+    Cari komentar yang mengandung SEMUA term query, diurutkan berdasarkan likes.
+    Posting list term paling jarang dibaca urut likes DESC dan berhenti setelah
+    `limit` hasil, sehingga biaya mengikuti jumlah hasil, bukan ukuran korpus.
+    """
+    terms = tokenize(query)
+    if not terms or limit <= 0:
+        return []
+
+    placeholders = ",".join("?" for _ in terms)
+    freqs = dict(conn.execute(
+        f"SELECT term, df FROM terms WHERE term IN ({placeholders}) AND df > 0", tuple(terms)
+    ).fetchall())
+    if len(freqs) < len(terms):
+        return []
+
+    driver, *others = sorted(terms, key=lambda term: freqs[term])
+    sql = "SELECT p.doc_id FROM postings p WHERE p.term = ?"
+    params = [driver]
+    for term in others:
+        sql += (
+            " AND EXISTS (SELECT 1 FROM postings q"
+            " WHERE q.term = ? AND q.likes = p.likes AND q.doc_id = p.doc_id)"
+        )
+        params.append(term)
+    sql += " ORDER BY p.likes DESC, p.doc_id DESC LIMIT ?"
+    params.append(limit)
+    doc_ids = [row["doc_id"] for row in conn.execute(sql, params)]
+    if not doc_ids:
+        return []
+
+    rows = conn.execute(
+        f"SELECT * FROM comments WHERE doc_id IN ({','.join('?' for _ in doc_ids)})", doc_ids
+    ).fetchall()
+    by_id = {row["doc_id"]: row for row in rows}
+    return [
+        {
+            "video_id": by_id[doc_id]["video_id"],
+            "video_title": by_id[doc_id]["video_title"],
+            "comment_id": by_id[doc_id]["comment_id"],
+            "author": by_id[doc_id]["author"],
+            "text": by_id[doc_id]["text"],
+            "published": by_id[doc_id]["published"],
+            "likes": by_id[doc_id]["likes"],
+            "replies_count": by_id[doc_id]["replies_count"],
+        }
+        for doc_id in doc_ids
+        if doc_id in by_id
+    ]
+
+
+def run_index_command(output_folder=DEFAULT_OUTPUT_FOLDER, index_path=DEFAULT_INDEX_PATH):
+    """Subcommand `index`: perbarui index dari folder output"""
+    print(f"🗂️  Memperbarui index: {index_path}")
+    conn = open_index(index_path)
+    try:
+        stats = update_index(conn, output_folder)
+    finally:
+        conn.close()
+    print(
+        f"✅ {stats['files_indexed']:,}/{stats['files_scanned']:,} file di-index "
+        f"(+{stats['comments_indexed']:,} komentar)"
+    )
+    if stats["files_removed"]:
+        print(f"🗑️  {stats['files_removed']:,} file dihapus dari index (-{stats['comments_removed']:,} komentar)")
+    return stats
+
+
+def run_search_command(query, limit=20, index_path=DEFAULT_INDEX_PATH):
+    """Subcommand `search`: tampilkan komentar yang cocok, urut likes"""
+    if not os.path.exists(index_path):
+        print(f"❌ Index belum ada: {index_path} (jalankan `python main.py index` dulu)")
+        return []
+    conn = open_index(index_path)
+    try:
+        results = search_comments(conn, query, limit)
+    finally:
+        conn.close()
+
+    if not results:
+        print(f"🔍 Tidak ada komentar yang cocok untuk: {query}")
+        return results
+
+    print(f"🔍 {len(results)} komentar teratas untuk: {query}")
+    for i, comment in enumerate(results, 1):
+        preview = " ".join(comment["text"].split())[:150]
+        if len(comment["text"]) > 150:
+            preview += "..."
+        print(f"\n[{i}] 👤 {comment['author']} | 👍 {comment['likes']:,} | 💬 {comment['replies_count']:,}")
+        print(f"    📹 {comment['video_title']} ({comment['video_id']})")
+        print(f"    💭 {preview}")
+    return results
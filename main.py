@@ -5,10 +5,14 @@ from datetime import datetime
 import os
 import re
 import csv
+import sys
+import argparse
 
 import google.generativeai as genai
-import requests
-from requests.exceptions import RequestException
+
+import comment_index
+import work_queue
+from youtube_comments import CommentFetchError, iter_comments
 
 # Konfigurasi Gemini AI (opsional)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
@@ -57,327 +61,21 @@ HTML (first 5000 chars):
         return None
 
 
-def extract_text(item):
-    """Helper untuk mengambil teks dari struktur YouTube (runs/simpleText)"""
-    if not item:
-        return ""
-    if isinstance(item, str):
-        return item
-    if isinstance(item, dict):
-        if "simpleText" in item:
-            return item["simpleText"]
-        if "runs" in item:
-            return "".join(part.get("text", "") for part in item["runs"] if isinstance(part, dict))
-    if isinstance(item, list):
-        return "".join(extract_text(part) for part in item)
-    return ""
-
-
-def normalize_count_value(value):
-    """Mengubah teks jumlah (mis. '1.2K likes') menjadi angka string"""
-    if value is None:
-        return "0"
-    text = str(value).strip()
-    if not text:
-        return "0"
-    text = text.replace("\u202f", "").replace(",", "")
-    suffix = text[-1].upper()
-    multipliers = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
-    if suffix in multipliers and text[:-1]:
-        try:
-            return str(int(float(text[:-1]) * multipliers[suffix]))
-        except ValueError:
-            pass
-    match = re.search(r"\d+", text)
-    if match:
-        return match.group(0)
-    return text
-
-
-def extract_comment_entities(framework_updates):
-    """Mengambil mapping commentKey -> payload (dipakai untuk commentViewModel)"""
-    entities = {}
-    if not framework_updates:
-        return entities
-    batch = framework_updates.get("entityBatchUpdate", {})
-    for mutation in batch.get("mutations", []):
-        payload = mutation.get("payload", {})
-        entity = payload.get("commentEntityPayload")
-        if entity and entity.get("key"):
-            entities[entity["key"]] = entity
-    return entities
-
-
-def _find_token_in_structure(node):
-    stack = [node]
-    while stack:
-        current = stack.pop()
-        if isinstance(current, dict):
-            command = current.get("continuationCommand")
-            if command and command.get("token"):
-                return command["token"]
-            for key in ("nextContinuationData", "reloadContinuationData"):
-                cont = current.get(key)
-                if isinstance(cont, dict) and cont.get("continuation"):
-                    return cont["continuation"]
-            if "continuationEndpoint" in current:
-                endpoint = current["continuationEndpoint"]
-                if isinstance(endpoint, dict):
-                    command = endpoint.get("continuationCommand")
-                    if command and command.get("token"):
-                        return command["token"]
-            stack.extend(current.values())
-        elif isinstance(current, list):
-            stack.extend(current)
-    return None
-
-
-def extract_comment_continuation(initial_data):
-    """Cari continuation token pertama untuk panel komentar"""
-    if not isinstance(initial_data, (dict, list)):
-        return None
-    stack = [initial_data]
-    while stack:
-        node = stack.pop()
-        if isinstance(node, dict):
-            panel = node.get("engagementPanelSectionListRenderer")
-            if panel:
-                identifier = panel.get("panelIdentifier") or panel.get("targetId")
-                if identifier == "engagement-panel-comments-section":
-                    token = _find_token_in_structure(panel)
-                    if token:
-                        return token
-            target_id = node.get("targetId") or node.get("panelIdentifier")
-            if target_id == "engagement-panel-comments-section":
-                token = _find_token_in_structure(node)
-                if token:
-                    return token
-            stack.extend(node.values())
-        elif isinstance(node, list):
-            stack.extend(node)
-    return None
-
-
-def extract_next_continuation(data):
-    """Ambil continuation token selanjutnya dari response API"""
-    if not isinstance(data, dict):
-        return None
-    endpoints = data.get("onResponseReceivedEndpoints", [])
-    for endpoint in endpoints:
-        for key in ("reloadContinuationItemsCommand", "appendContinuationItemsAction"):
-            if key in endpoint:
-                token = _find_token_in_structure(endpoint[key])
-                if token:
-                    return token
-    return _find_token_in_structure(data)
-
-
-def parse_legacy_comment(thread_renderer, index):
-    comment_renderer = thread_renderer.get("comment", {}).get("commentRenderer")
-    if not comment_renderer:
-        return None
-    text = extract_text(comment_renderer.get("contentText"))
-    if not text:
-        return None
-    author = extract_text(comment_renderer.get("authorText")) or "Unknown"
-    published = extract_text(comment_renderer.get("publishedTimeText")) or "Unknown"
-    like_text = (
-        extract_text(comment_renderer.get("voteCount")) or comment_renderer.get("likeCount")
-    )
-    replies_renderer = thread_renderer.get("replies", {}).get("commentRepliesRenderer")
-    replies_text = None
-    if replies_renderer:
-        replies_text = (
-            extract_text(replies_renderer.get("moreText"))
-            or extract_text(replies_renderer.get("viewReplies"))
-            or replies_renderer.get("replyCount")
-        )
-    comment_id = comment_renderer.get("commentId")
-    return {
-        "index": index,
-        "comment_id": comment_id,
-        "author": author,
-        "text": text.strip(),
-        "published": published,
-        "likes": normalize_count_value(like_text),
-        "replies_count": normalize_count_value(replies_text),
-    }
-
-
-def parse_view_model_comment(thread_renderer, entities, index):
-    view_model = thread_renderer.get("commentViewModel", {}).get("commentViewModel", {})
-    comment_key = view_model.get("commentKey")
-    if not comment_key:
-        return None
-    entity = entities.get(comment_key)
-    if not entity:
-        return None
-    props = entity.get("properties", {})
-    text = props.get("content", {}).get("content")
-    if not text:
-        return None
-    author = props.get("authorButtonA11y") or entity.get("author", {}).get("displayName") or "Unknown"
-    published = props.get("publishedTime") or "Unknown"
-    toolbar = entity.get("toolbar", {})
-    like_hint = toolbar.get("likeCountA11y") or toolbar.get("likeCountNotliked") or toolbar.get("likeCountLiked")
-    replies_hint = toolbar.get("replyCount")
-    comment_id = props.get("commentId")
-    return {
-        "index": index,
-        "comment_id": comment_id,
-        "author": author,
-        "text": text.strip(),
-        "published": published,
-        "likes": normalize_count_value(like_hint),
-        "replies_count": normalize_count_value(replies_hint),
-    }
-
-
-def parse_comment_from_thread(thread_renderer, entities, index):
-    legacy = parse_legacy_comment(thread_renderer, index)
-    if legacy:
-        return legacy
-    return parse_view_model_comment(thread_renderer, entities, index)
-
-
-def parse_comment_response(data, entities, existing_total, seen_ids):
-    items = []
-    for endpoint in data.get("onResponseReceivedEndpoints", []):
-        if "reloadContinuationItemsCommand" in endpoint:
-            items.extend(endpoint["reloadContinuationItemsCommand"].get("continuationItems", []))
-        if "appendContinuationItemsAction" in endpoint:
-            items.extend(endpoint["appendContinuationItemsAction"].get("continuationItems", []))
-    parsed = []
-    for item in items:
-        renderer = item.get("commentThreadRenderer")
-        if not renderer:
-            continue
-        comment = parse_comment_from_thread(renderer, entities, existing_total + len(parsed) + 1)
-        if not comment:
-            continue
-        dedupe_key = comment.get("comment_id") or f"{comment['author']}::{comment['text']}"
-        if dedupe_key in seen_ids:
-            continue
-        seen_ids.add(dedupe_key)
-        parsed.append(comment)
-    return parsed
-
-
 def fetch_comments_via_api(driver, url, target_count=None):
     """
     Gunakan endpoint internal YouTube untuk mengambil komentar.
     target_count: None untuk semua komentar, atau integer untuk jumlah spesifik
     """
-    try:
-        api_key = driver.run_js(
-            "return (window.ytcfg && window.ytcfg.get) ? window.ytcfg.get('INNERTUBE_API_KEY') : null;"
-        )
-        context = driver.run_js(
-            "return (window.ytcfg && window.ytcfg.get) ? window.ytcfg.get('INNERTUBE_CONTEXT') : null;"
-        )
-        initial_data = driver.run_js("return window.ytInitialData || null;")
-        user_agent = driver.run_js("return navigator.userAgent;")
-    except Exception as exc:
-        print(f"⚠️  Gagal membaca konfigurasi YouTube: {exc}")
-        return None
-
-    if not api_key or not context or not initial_data:
-        return None
-
-    continuation = extract_comment_continuation(initial_data)
-    if not continuation:
-        return None
-
-    api_endpoint = f"https://www.youtube.com/youtubei/v1/next?key={api_key}"
-    headers = {
-        "Content-Type": "application/json",
-        "Origin": "https://www.youtube.com",
-        "Referer": url,
-        "User-Agent": user_agent or "Mozilla/5.0",
-        "X-YouTube-Client-Name": str(context.get("client", {}).get("clientName", "WEB")),
-        "X-YouTube-Client-Version": context.get("client", {}).get("clientVersion", "2.20251109.10.00"),
-    }
-
     comments = []
-    seen_ids = set()
-    entities_cache = {}
-
-    with requests.Session() as session:
-        token = continuation
-        page = 0
-        consecutive_empty = 0
-        max_consecutive_empty = 5  # Tingkatkan toleransi
-        
-        while token:
-            page += 1
-            payload = {
-                "context": context,
-                "continuation": token,
-            }
-            try:
-                response = session.post(api_endpoint, headers=headers, json=payload, timeout=30)
-                response.raise_for_status()
-            except RequestException as req_err:
-                print(f"⚠️  Permintaan komentar batch {page} gagal: {req_err}")
-                # Jangan langsung break, coba lanjut dengan token berikutnya
-                consecutive_empty += 1
-                if consecutive_empty >= max_consecutive_empty:
-                    break
-                continue
-            
-            try:
-                data = response.json()
-            except ValueError as parse_err:
-                print(f"⚠️  Response komentar tidak valid: {parse_err}")
-                consecutive_empty += 1
-                if consecutive_empty >= max_consecutive_empty:
-                    break
-                continue
-
-            # Update entities cache
-            entities_cache.update(extract_comment_entities(data.get("frameworkUpdates")))
-            
-            # Parse comments dari response
-            new_comments = parse_comment_response(data, entities_cache, len(comments), seen_ids)
-            
-            if new_comments:
-                comments.extend(new_comments)
-                print(f"  📥 API batch {page}: +{len(new_comments)} komentar (total {len(comments)})")
-                consecutive_empty = 0  # Reset counter
-                
-                # Jika ada target count dan sudah tercapai, stop
-                if target_count and len(comments) >= target_count:
-                    print(f"  ✅ Target {target_count:,} komentar tercapai!")
-                    break
-            else:
-                consecutive_empty += 1
-                if consecutive_empty <= 2:
-                    print(f"  ⏭️  API batch {page}: tidak ada komentar baru, mencoba lanjut...")
-                else:
-                    print(f"  ⚠️  API batch {page}: tidak ada komentar baru ({consecutive_empty}x)")
-                
-                # Jika sudah beberapa kali berturut-turut tidak ada komentar baru, stop
-                if consecutive_empty >= max_consecutive_empty:
-                    print(f"  ⚠️  Tidak ada komentar baru setelah {max_consecutive_empty}x percobaan, berhenti.")
-                    break
-
-            # Ambil continuation token untuk batch selanjutnya
-            next_token = extract_next_continuation(data)
-            
-            if not next_token:
-                print("  ✅ Semua komentar telah diambil (tidak ada continuation token)")
-                break
-            
-            # Pastikan token berbeda dari sebelumnya (cegah infinite loop)
-            if next_token == token:
-                print("  ⚠️  Token sama, kemungkinan sudah tidak ada komentar lagi")
-                break
-                
-            token = next_token
+    try:
+        for batch in iter_comments(url, driver=driver, target_count=target_count, verbose=True):
+            comments.extend(batch)
+    except CommentFetchError as e:
+        print(f"⚠️  {e}")
 
     if comments:
         print(f"\n📊 Total berhasil mengambil {len(comments):,} komentar")
-    
+
     return comments
 
 
@@ -428,8 +126,8 @@ def save_outputs(result, output_folder):
         for i, comment in enumerate(result.get('comments', []), start=1):
             author = comment.get('author', 'Unknown')
             published = comment.get('published', 'N/A')
-            likes = comment.get('likes', '0')
-            replies = comment.get('replies_count', '0')
+            likes = comment.get('likes', 0)
+            replies = comment.get('replies_count', 0)
             text = comment.get('text', '')
             text = ' '.join(text.split())
             
@@ -453,8 +151,8 @@ def save_outputs(result, output_folder):
                         'Author': comment.get('author', 'Unknown'),
                         'Comment': comment.get('text', ''),
                         'Published': comment.get('published', 'N/A'),
-                        'Likes': comment.get('likes', '0'),
-                        'Replies': comment.get('replies_count', '0')
+                        'Likes': comment.get('likes', 0),
+                        'Replies': comment.get('replies_count', 0)
                     })
     except Exception as e:
         print(f"⚠️  Gagal membuat CSV: {e}")
@@ -481,15 +179,16 @@ def save_outputs(result, output_folder):
         'summary': summary_path
     }
 
-@browser(
-    chrome_executable_path=r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe",
-    block_images_and_css=False,
-    wait_for_complete_page_load=True,
-    headless=False,
-    reuse_driver=True,
-)
+BROWSER_OPTIONS = {
+    "chrome_executable_path": r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe",
+    "block_images_and_css": False,
+    "wait_for_complete_page_load": True,
+    "headless": False,
+    "reuse_driver": True,
+}
 
-def scrape_youtube_comments(driver: Driver, data):
+
+def scrape_comments_with_driver(driver: Driver, data):
     """Scraper YouTube comments yang enhanced"""
     url = data["url"]
     target_count = data.get("target_count")
@@ -617,6 +316,21 @@ def scrape_youtube_comments(driver: Driver, data):
     return result
 
 
+@browser(**BROWSER_OPTIONS)
+def scrape_youtube_comments(driver: Driver, data):
+    """Entry point menu interaktif"""
+    return scrape_comments_with_driver(driver, data)
+
+
+@browser(**{**BROWSER_OPTIONS, "reuse_driver": False}, close_on_crash=True, raise_exception=True)
+def scrape_youtube_comments_job(driver: Driver, data):
+    """
+    Entry point worker: saat crash browser tidak menunggu input dan error diteruskan ke queue.
+    Tiap job berjalan di proses anak sendiri, jadi browser ditutup setelah job selesai.
+    """
+    return scrape_comments_with_driver(driver, data)
+
+
 def main():
     """Function utama dengan menu interaktif yang lebih baik"""
     print("═" * 70)
@@ -741,5 +455,98 @@ def main():
     print()
 
 
+def build_arg_parser():
+    """Subcommand non-interaktif; tanpa argumen akan membuka menu interaktif"""
+    parser = argparse.ArgumentParser(description="YouTube Comment Scraper")
+    subparsers = parser.add_subparsers(dest="command")
+
+    index_parser = subparsers.add_parser("index", help="Perbarui index pencarian dari folder output")
+    index_parser.add_argument("--output", default=comment_index.DEFAULT_OUTPUT_FOLDER, help="Folder output hasil scraping")
+    index_parser.add_argument("--db", default=comment_index.DEFAULT_INDEX_PATH, help="Lokasi file index")
+
+    search_parser = subparsers.add_parser("search", help="Cari komentar di index, urut berdasarkan likes")
+    search_parser.add_argument("query", nargs="+", help="Kata kunci (semua harus cocok)")
+    search_parser.add_argument("--limit", type=int, default=20, help="Jumlah hasil maksimum")
+    search_parser.add_argument("--db", default=comment_index.DEFAULT_INDEX_PATH, help="Lokasi file index")
+
+    queue_parser = subparsers.add_parser("queue", help="Kelola antrean job scraping (multi-worker)")
+    queue_parser.add_argument("--db", default=work_queue.DEFAULT_QUEUE_PATH, help="Lokasi file queue")
+    queue_subparsers = queue_parser.add_subparsers(dest="queue_command")
+    add_parser = queue_subparsers.add_parser("add", help="Tambah URL video ke antrean")
+    add_parser.add_argument("urls", nargs="+", help="URL video YouTube")
+    add_parser.add_argument("--target", type=int, default=None, help="Jumlah komentar per video (default: semua)")
+    add_parser.add_argument("--max-attempts", type=int, default=work_queue.DEFAULT_MAX_ATTEMPTS)
+    queue_subparsers.add_parser("status", help="Tampilkan jumlah job per status")
+
+    worker_parser = subparsers.add_parser("worker", help="Jalankan worker yang mengambil job dari antrean")
+    worker_parser.add_argument("--db", default=work_queue.DEFAULT_QUEUE_PATH, help="Lokasi file queue")
+    worker_parser.add_argument("--id", default=None, help="ID worker (default: hostname:pid)")
+    worker_parser.add_argument("--lease", type=int, default=work_queue.DEFAULT_LEASE_SECONDS, help="Durasi lease (detik)")
+    worker_parser.add_argument(
+        "--max-job-seconds", type=int, default=work_queue.DEFAULT_MAX_JOB_SECONDS,
+        help="Batas waktu per job; proses scraping dihentikan paksa dan job dijadwalkan ulang",
+    )
+    worker_parser.add_argument("--max-jobs", type=int, default=None, help="Berhenti setelah N job")
+    worker_parser.add_argument("--exit-when-empty", action="store_true", help="Berhenti saat antrean kosong")
+
+    return parser
+
+
+def scrape_queue_job(job):
+    """Jalankan satu job antrean dan kembalikan ringkasan hasil untuk disimpan di queue"""
+    result = scrape_youtube_comments_job({
+        "url": job["url"],
+        "target_count": job.get("target_count"),
+        "use_ai": False,
+    })
+    if not result:
+        return None
+    # Tidak ada komentar biasanya karena konfigurasi/API gagal sementara: biarkan di-retry
+    if result.get("comments_source") == "none":
+        raise RuntimeError("tidak ada komentar yang berhasil diambil")
+    return {
+        "video_id": result.get("video_id"),
+        "video_title": result.get("video_title"),
+        "total_comments": result.get("total_comments", 0),
+        "scraped_at": result.get("scraped_at"),
+    }
+
+
+def run_queue_command(args):
+    queue = work_queue.SQLiteWorkQueue(args.db)
+    if args.queue_command == "add":
+        for url in args.urls:
+            job_id = queue.enqueue(url, args.target, args.max_attempts)
+            print(f"➕ Job #{job_id}: {url}")
+    stats = queue.stats()
+    print(f"📋 Queue {args.db}: " + " | ".join(f"{status}: {total:,}" for status, total in stats.items()))
+
+
+def run_command(argv):
+    args = build_arg_parser().parse_args(argv)
+    if args.command == "index":
+        comment_index.run_index_command(args.output, args.db)
+    elif args.command == "search":
+        comment_index.run_search_command(" ".join(args.query), args.limit, args.db)
+    elif args.command == "queue":
+        run_queue_command(args)
+    elif args.command == "worker":
+        queue = work_queue.SQLiteWorkQueue(args.db)
+        work_queue.run_worker(
+            queue,
+            scrape_queue_job,
+            worker_id=args.id,
+            lease_seconds=args.lease,
+            max_job_seconds=args.max_job_seconds,
+            max_jobs=args.max_jobs,
+            exit_when_empty=args.exit_when_empty,
+        )
+    else:
+        main()
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        run_command(sys.argv[1:])
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,142 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+import comment_index
+
+
+def _comment(comment_id, text, likes):
+    return {"comment_id": comment_id, "author": "Zoel", "text": text, "likes": likes, "replies_count": 0}
+
+
+def _write_export(output_folder, folder, name, video_id, comments, mtime):
+    """Tulis file seperti save_outputs, dengan mtime eksplisit agar urutannya pasti"""
+    path = os.path.join(output_folder, folder, f"comments_{name}.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"video_id": video_id, "video_title": folder, "comments": comments}, f)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def _search(conn, query):
+    return [(row["video_id"], row["comment_id"], row["likes"]) for row in comment_index.search_comments(conn, query)]
+
+
+def _assert_consistent(conn):
+    """Jumlah postings harus sama dengan total df, dan tidak ada postings yatim"""
+    postings = conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+    total_df = conn.execute("SELECT COALESCE(SUM(df), 0) FROM terms").fetchone()[0]
+    orphans = conn.execute(
+        "SELECT COUNT(*) FROM postings WHERE doc_id NOT IN (SELECT doc_id FROM comments)"
+    ).fetchone()[0]
+    assert postings == total_df
+    assert orphans == 0
+
+
+@pytest.fixture
+def output_folder(tmp_path):
+    return str(tmp_path / "output")
+
+
+@pytest.fixture
+def conn(tmp_path):
+    connection = comment_index.open_index(str(tmp_path / "index.db"))
+    yield connection
+    connection.close()
+
+
+def test_search_ranks_by_likes_and_requires_all_terms(output_folder, conn):
+    _write_export(output_folder, "Song_vid1", "1", "vid1", [
+        _comment("a", "great song", 5),
+        _comment("b", "great video", 50),
+        _comment("c", "great song forever", 20),
+    ], mtime=1000)
+    comment_index.update_index(conn, output_folder)
+
+    assert _search(conn, "great") == [("vid1", "b", 50), ("vid1", "c", 20), ("vid1", "a", 5)]
+    assert _search(conn, "great song") == [("vid1", "c", 20), ("vid1", "a", 5)]
+    assert _search(conn, "missing") == []
+
+
+def test_deleting_newer_export_in_renamed_folder_restores_older_copy(output_folder, conn):
+    # Judul video berubah di antara dua scraping -> folder berbeda untuk video yang sama
+    _write_export(output_folder, "Old_vid1", "1", "vid1", [_comment("c1", "kucing lucu", 5)], mtime=1000)
+    comment_index.update_index(conn, output_folder)
+    newer = _write_export(output_folder, "New_vid1", "2", "vid1", [_comment("c1", "kucing lucu", 9)], mtime=2000)
+    comment_index.update_index(conn, output_folder)
+    assert _search(conn, "kucing") == [("vid1", "c1", 9)]
+
+    os.remove(newer)
+    stats = comment_index.update_index(conn, output_folder)
+
+    assert stats["files_removed"] == 1
+    assert _search(conn, "kucing") == [("vid1", "c1", 5)]
+    _assert_consistent(conn)
+
+
+def test_rewritten_export_drops_missing_comments(output_folder, conn):
+    path = _write_export(output_folder, "V_vid1", "1", "vid1", [
+        _comment("c1", "kucing lucu", 5),
+        _comment("c2", "anjing lucu", 3),
+    ], mtime=1000)
+    comment_index.update_index(conn, output_folder)
+
+    _write_export(output_folder, "V_vid1", "1", "vid1", [_comment("c2", "anjing lucu", 4)], mtime=2000)
+    comment_index.update_index(conn, output_folder)
+
+    assert _search(conn, "lucu") == [("vid1", "c2", 4)]
+    assert _search(conn, "kucing") == []
+    assert [row[0] for row in conn.execute("SELECT path FROM files")] == [path]
+    _assert_consistent(conn)
+
+
+def test_moved_export_is_removed_and_reindexed_at_new_path(output_folder, conn, tmp_path):
+    path = _write_export(output_folder, "V_vid1", "1", "vid1", [_comment("c1", "burung lucu", 1)], mtime=1000)
+    comment_index.update_index(conn, output_folder)
+
+    os.rename(os.path.dirname(path), os.path.join(output_folder, "Renamed_vid1"))
+    comment_index.update_index(conn, output_folder)
+    assert [row["source_path"] for row in conn.execute("SELECT source_path FROM comments")] == [
+        os.path.join(output_folder, "Renamed_vid1", "comments_1.json")
+    ]
+
+    os.rename(os.path.join(output_folder, "Renamed_vid1"), str(tmp_path / "archive"))
+    comment_index.update_index(conn, output_folder)
+    assert _search(conn, "burung") == []
+    _assert_consistent(conn)
+
+
+def test_file_vanishing_during_scan_is_skipped(output_folder, conn, monkeypatch):
+    kept = _write_export(output_folder, "V_vid1", "1", "vid1", [_comment("c1", "kucing lucu", 5)], mtime=1000)
+    gone = os.path.join(output_folder, "V_vid2", "comments_2.json")
+
+    # glob masih melihat file yang sudah dihapus
+    monkeypatch.setattr(comment_index.glob, "glob", lambda pattern: [gone, kept])
+    assert comment_index.find_output_files(output_folder) == [kept]
+
+    # File hilang di antara listing dan os.stat
+    monkeypatch.setattr(comment_index, "find_output_files", lambda folder: [gone, kept])
+    stats = comment_index.update_index(conn, output_folder)
+
+    assert stats["files_indexed"] == 1
+    assert _search(conn, "kucing") == [("vid1", "c1", 5)]
+
+
+def test_old_index_without_file_video_ids_is_migrated(output_folder, tmp_path):
+    index_path = str(tmp_path / "old.db")
+    legacy = sqlite3.connect(index_path)
+    legacy.execute("CREATE TABLE files (path TEXT PRIMARY KEY, mtime REAL NOT NULL, size INTEGER NOT NULL)")
+    legacy.execute("INSERT INTO files VALUES ('x', 1, 1)")
+    legacy.commit()
+    legacy.close()
+
+    conn = comment_index.open_index(index_path)
+    try:
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(files)")}
+        assert "video_id" in columns
+        assert conn.execute("SELECT COUNT(*) FROM files").fetchone()[0] == 0
+    finally:
+        conn.close()
@@ -0,0 +1,159 @@
+import functools
+import json
+import multiprocessing
+import os
+import sqlite3
+import time
+
+import pytest
+
+import work_queue
+
+
+def _record_scrape(job):
+    """scrape_fn palsu: catat setiap eksekusi ke file agar bisa dihitung dari proses induk"""
+    log_path = os.path.join(os.path.dirname(job["db_path"]), "executions.log")
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(f"{job['url']}\n")
+    time.sleep(0.01)
+    if job["url"].endswith("/flaky") and job["attempts"] == 1:
+        raise RuntimeError("gagal sementara")
+    return {"url": job["url"], "pid": os.getpid()}
+
+
+def _hang_scrape(job):
+    """Scraper macet yang, jika tidak dihentikan, masih menulis hasil terlambat"""
+    time.sleep(1)
+    with open(os.path.join(os.path.dirname(job["db_path"]), "late_output.json"), "w") as f:
+        f.write("{}")
+    return {"url": job["url"]}
+
+
+def _with_db_path(scrape_fn, db_path, job):
+    return scrape_fn(dict(job, db_path=db_path))
+
+
+def _run_worker(db_path, worker_id, scrape_fn, **kwargs):
+    queue = work_queue.SQLiteWorkQueue(db_path)
+    # partial di level modul agar tetap bisa di-pickle untuk proses anak per job
+    scrape_with_path = functools.partial(_with_db_path, scrape_fn, db_path)
+    return work_queue.run_worker(queue, scrape_with_path, worker_id=worker_id, poll_interval=0.05, **kwargs)
+
+
+def _jobs(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return {row["url"]: dict(row) for row in conn.execute("SELECT * FROM jobs")}
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "queue.db")
+
+
+def test_workqueue_is_abstract():
+    class Incomplete(work_queue.WorkQueue):
+        def enqueue(self, url, target_count=None, max_attempts=3):
+            return 1
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_enqueue_deduplicates_url(db_path):
+    queue = work_queue.SQLiteWorkQueue(db_path)
+    first = queue.enqueue("https://youtube.com/watch?v=a")
+    assert queue.enqueue("https://youtube.com/watch?v=a") == first
+    assert queue.stats()[work_queue.STATUS_PENDING] == 1
+
+
+def test_expired_lease_is_reclaimed_and_stale_token_rejected(db_path):
+    queue = work_queue.SQLiteWorkQueue(db_path)
+    queue.enqueue("https://youtube.com/watch?v=a")
+    first = queue.claim("w1", lease_seconds=0.1)
+    assert queue.claim("w2", lease_seconds=0.1) is None
+
+    time.sleep(0.2)
+    second = queue.claim("w2", lease_seconds=10)
+    assert second["id"] == first["id"]
+    assert second["attempts"] == 2
+    assert not queue.complete(first["id"], first["lease_token"], {"ok": True})
+    assert queue.complete(second["id"], second["lease_token"], {"ok": True})
+    assert queue.stats()[work_queue.STATUS_DONE] == 1
+
+
+def test_multiple_worker_processes_scrape_each_job_once(db_path):
+    queue = work_queue.SQLiteWorkQueue(db_path)
+    urls = [f"https://youtube.com/watch?v={i}" for i in range(30)]
+    urls.append("https://youtube.com/watch?v=x/flaky")
+    for url in urls:
+        queue.enqueue(url)
+
+    workers = [
+        multiprocessing.Process(
+            target=_run_worker,
+            args=(db_path, f"w{i}", _record_scrape),
+            kwargs={"lease_seconds": 5, "retry_delay": 0.2, "exit_when_empty": True},
+        )
+        for i in range(4)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    with open(os.path.join(os.path.dirname(db_path), "executions.log"), encoding="utf-8") as f:
+        executions = f.read().split()
+    jobs = _jobs(db_path)
+    assert all(job["status"] == work_queue.STATUS_DONE for job in jobs.values())
+    for url in urls:
+        expected = 2 if url.endswith("/flaky") else 1
+        assert executions.count(url) == expected
+        assert jobs[url]["attempts"] == expected
+
+
+def test_exit_when_empty_waits_for_pending_retry(db_path):
+    queue = work_queue.SQLiteWorkQueue(db_path)
+    queue.enqueue("https://youtube.com/watch?v=x/flaky")
+
+    _run_worker(db_path, "w1", _record_scrape, lease_seconds=5, retry_delay=0.3, exit_when_empty=True)
+
+    job = _jobs(db_path)["https://youtube.com/watch?v=x/flaky"]
+    assert job["status"] == work_queue.STATUS_DONE
+    assert job["attempts"] == 2
+
+
+def test_hung_job_is_killed_after_max_job_seconds_and_rescheduled(db_path):
+    queue = work_queue.SQLiteWorkQueue(db_path)
+    queue.enqueue("https://youtube.com/watch?v=hang")
+
+    started = time.monotonic()
+    processed = _run_worker(
+        db_path, "hung", _hang_scrape, lease_seconds=0.3, max_job_seconds=0.3, max_jobs=1, retry_delay=30
+    )
+    assert processed == 1
+    assert time.monotonic() - started < 1
+
+    job = _jobs(db_path)["https://youtube.com/watch?v=hang"]
+    assert job["status"] == work_queue.STATUS_PENDING
+    assert job["attempts"] == 1
+    assert "batas" in job["error"]
+
+    # Proses scraper sudah dihentikan: tidak ada hasil terlambat
+    time.sleep(1.2)
+    assert not os.path.exists(os.path.join(os.path.dirname(db_path), "late_output.json"))
+
+
+def test_without_max_job_seconds_scrape_runs_in_worker_process(db_path):
+    queue = work_queue.SQLiteWorkQueue(db_path)
+    queue.enqueue("https://youtube.com/watch?v=a")
+
+    _run_worker(db_path, "w1", _record_scrape, max_job_seconds=None, exit_when_empty=True)
+
+    job = _jobs(db_path)["https://youtube.com/watch?v=a"]
+    assert job["status"] == work_queue.STATUS_DONE
+    assert json.loads(job["result"])["pid"] == os.getpid()
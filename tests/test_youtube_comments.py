@@ -0,0 +1,209 @@
+import json
+import os
+import threading
+
+import pytest
+import requests
+
+import youtube_comments
+from youtube_comments import CommentFetchError, iter_comments, normalize_count_value
+
+FIXTURE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures", "next_view_model_id.json"
+)
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize(
+    "value, hl, expected",
+    [
+        ("1.2K", "en", 1200),
+        ("3M", "en", 3_000_000),
+        ("1,234 likes", "en", 1234),
+        ("1 reply", "en-GB", 1),
+        ("1,2 rb", "id", 1200),
+        ("1,2\xa0rb", "id", 1200),
+        ("3 jt", "id", 3_000_000),
+        ("2,5 M", "id", 2_500_000_000),
+        ("12 balasan", "id", 12),
+        ("1,000", "id", 1000),
+        ("1.000", "en", 1000),
+        ("1.2K", "id", 1200),
+        ("12,3", "id", 12),
+        ("1.234.567", "id", 1_234_567),
+        ("1\u202f234", "fr", 1234),
+        ("1\xa0234\xa0567", "fr", 1_234_567),
+        ("Suka", "id", 0),
+        ("", "en", 0),
+        (None, "en", 0),
+        (7, "en", 7),
+    ],
+)
+def test_normalize_count_value(value, hl, expected):
+    assert normalize_count_value(value, hl) == expected
+
+
+def test_normalize_count_value_is_cached():
+    youtube_comments._parse_count_text.cache_clear()
+    normalize_count_value("1,2 rb", "id")
+    normalize_count_value("1,2 rb", "id")
+    assert youtube_comments._parse_count_text.cache_info().hits == 1
+
+
+class StubResponse:
+    def __init__(self, body, status_code=200):
+        self.text = body
+        self.content = body.encode("utf-8")
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class StubSession:
+    """Session palsu: halaman watch statis, lalu halaman fixture /next secara berurutan"""
+
+    def __init__(self, pages, watch_html=None, watch_status=200, post_error=None):
+        self.pages = [json.dumps(page) for page in pages]
+        self.watch_html = watch_html if watch_html is not None else _watch_html()
+        self.watch_status = watch_status
+        self.post_error = post_error
+        self.get_urls = []
+        self.posts = 0
+
+    def get(self, url, headers=None, timeout=None):
+        self.get_urls.append(url)
+        return StubResponse(self.watch_html, self.watch_status)
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        self.posts += 1
+        if self.post_error is not None:
+            raise self.post_error
+        if self.posts > len(self.pages):
+            return StubResponse("{}")
+        return StubResponse(self.pages[self.posts - 1])
+
+
+def _watch_html(continuation="token-awal"):
+    ytcfg = {
+        "INNERTUBE_API_KEY": "kunci",
+        "INNERTUBE_CONTEXT": {"client": {"hl": "id", "clientName": "WEB", "clientVersion": "2.0"}},
+    }
+    initial_data = {"engagementPanels": [{"engagementPanelSectionListRenderer": {
+        "panelIdentifier": "engagement-panel-comments-section",
+        "content": {"continuationCommand": {"token": continuation}} if continuation else {},
+    }}]}
+    return (
+        f"<script>ytcfg.set({json.dumps(ytcfg)});</script>"
+        f"<script>var ytInitialData = {json.dumps(initial_data)};</script>"
+    )
+
+
+def _collect(generator):
+    """Kumpulkan semua batch beserta nilai return generator (alasan berhenti)"""
+    batches = []
+    while True:
+        try:
+            batches.append(next(generator))
+        except StopIteration as stop:
+            return batches, stop.value
+
+
+@pytest.fixture(scope="module")
+def pages():
+    with open(FIXTURE_PATH, encoding="utf-8") as f:
+        return json.load(f)["pages"]
+
+
+def test_video_watch_url_accepts_id_or_url():
+    assert youtube_comments.video_watch_url(f" {VIDEO_ID} ") == f"https://www.youtube.com/watch?v={VIDEO_ID}"
+    url = f"https://youtu.be/{VIDEO_ID}"
+    assert youtube_comments.video_watch_url(url) == url
+
+
+def test_iter_comments_reads_all_pages_until_end(pages):
+    session = StubSession(pages)
+    batches, reason = _collect(iter_comments(VIDEO_ID, session=session))
+
+    assert reason == youtube_comments.STOP_END
+    assert [len(batch) for batch in batches] == [20] * len(pages)
+    assert session.get_urls == [f"https://www.youtube.com/watch?v={VIDEO_ID}"]
+    # hl dari INNERTUBE_CONTEXT dipakai untuk normalisasi jumlah
+    assert all(isinstance(comment["likes"], int) for batch in batches for comment in batch)
+
+
+def test_iter_comments_stops_at_max_pages(pages):
+    session = StubSession(pages)
+    batches, reason = _collect(iter_comments(VIDEO_ID, session=session, max_pages=2))
+    assert reason == youtube_comments.STOP_MAX_PAGES
+    assert len(batches) == 2
+    assert session.posts == 2
+
+
+def test_iter_comments_max_bytes_counts_watch_page(pages):
+    page_bytes = len(_watch_html().encode("utf-8"))
+
+    session = StubSession(pages)
+    batches, reason = _collect(iter_comments(VIDEO_ID, session=session, max_bytes=page_bytes))
+    assert reason == youtube_comments.STOP_MAX_BYTES
+    assert batches == []
+    assert session.posts == 0
+
+    session = StubSession(pages)
+    batches, reason = _collect(iter_comments(VIDEO_ID, session=session, max_bytes=page_bytes + 1))
+    assert reason == youtube_comments.STOP_MAX_BYTES
+    assert len(batches) == 1
+
+
+def test_iter_comments_zero_seconds_budget_requests_nothing(pages):
+    session = StubSession(pages)
+    batches, reason = _collect(iter_comments(VIDEO_ID, session=session, max_seconds=0))
+    assert reason == youtube_comments.STOP_MAX_SECONDS
+    assert batches == []
+    assert session.posts == 0
+
+
+def test_iter_comments_stops_at_target_count(pages):
+    session = StubSession(pages)
+    batches, reason = _collect(iter_comments(VIDEO_ID, session=session, target_count=30))
+    assert reason == youtube_comments.STOP_TARGET
+    assert sum(len(batch) for batch in batches) == 40
+    assert session.posts == 2
+
+
+def test_iter_comments_honours_cancel_event(pages):
+    cancel = threading.Event()
+    session = StubSession(pages)
+    generator = iter_comments(VIDEO_ID, session=session, cancel_event=cancel)
+    assert len(next(generator)) == 20
+    cancel.set()
+    batches, reason = _collect(generator)
+    assert reason == youtube_comments.STOP_CANCELLED
+    assert batches == []
+    assert session.posts == 1
+
+
+@pytest.mark.parametrize(
+    "session",
+    [
+        StubSession([], watch_status=404),
+        StubSession([], watch_html="<html></html>"),
+        StubSession([], watch_html=_watch_html(continuation=None)),
+    ],
+    ids=["halaman-gagal", "tanpa-ytcfg", "tanpa-token"],
+)
+def test_iter_comments_raises_on_setup_failure(session):
+    with pytest.raises(CommentFetchError):
+        list(iter_comments(VIDEO_ID, session=session))
+    assert session.posts == 0
+
+
+def test_iter_comments_raises_after_repeated_request_failures():
+    session = StubSession([], post_error=requests.ConnectionError("koneksi putus"))
+    with pytest.raises(CommentFetchError, match="koneksi putus"):
+        list(iter_comments(VIDEO_ID, session=session))
+    assert session.posts == 5
@@ -0,0 +1,346 @@
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+# Locking SQLite hanya andal di filesystem lokal: semua worker harus di host yang sama.
+# Jangan taruh file ini di NFS/SMB; multi-node butuh backend WorkQueue berbasis server.
+DEFAULT_QUEUE_PATH = "work_queue.db"
+DEFAULT_LEASE_SECONDS = 600
+DEFAULT_MAX_JOB_SECONDS = 2 * 3600
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_DELAY = 60
+
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    target_count INTEGER,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_token TEXT,
+    lease_expires_at REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_idx ON jobs (status, available_at);
+"""
+
+
+class WorkQueue(ABC):
+    """
+    Interface antrean job scraping dengan lease.
+    Implementasi lain (mis. server HTTP) wajib menyediakan semua method ini.
+    """
+
+    @abstractmethod
+    def enqueue(self, url, target_count=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """Tambah job; URL yang sudah ada tidak diduplikasi. Return id job"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim(self, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Ambil satu job (termasuk job dengan lease kadaluarsa). Return dict job atau None"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def heartbeat(self, job_id, lease_token, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Perpanjang lease. Return False jika lease sudah hilang"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, job_id, lease_token, result=None):
+        """Tandai job selesai. Return False jika lease sudah hilang"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def fail(self, job_id, lease_token, error, retry_delay=DEFAULT_RETRY_DELAY):
+        """Laporkan kegagalan; job diulang sampai max_attempts. Return False jika lease sudah hilang"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self):
+        """Jumlah job per status"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def next_available_at(self):
+        """Waktu (epoch) job pending berikutnya boleh di-claim, atau None jika tidak ada"""
+        raise NotImplementedError
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Antrean berbasis SQLite; koordinasi antar proses memakai file lock SQLite.
+    Hanya untuk banyak worker di satu host (filesystem lokal), bukan NFS/SMB.
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, busy_timeout=30):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        # Koneksi baru per operasi: aman dipakai thread heartbeat dan proses hasil fork
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _write(self, fn):
+        """Jalankan fn(conn) dalam transaksi BEGIN IMMEDIATE (write lock eksklusif)"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                value = fn(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return value
+        finally:
+            conn.close()
+
+    def enqueue(self, url, target_count=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        def op(conn):
+            now = time.time()
+            conn.execute(
+                """INSERT OR IGNORE INTO jobs (url, target_count, status, max_attempts, available_at,
+                       created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (url, target_count, STATUS_PENDING, max_attempts, now, now, now),
+            )
+            return conn.execute("SELECT id FROM jobs WHERE url = ?", (url,)).fetchone()["id"]
+        return self._write(op)
+
+    def claim(self, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        def op(conn):
+            now = time.time()
+            # Lease kadaluarsa yang sudah habis jatah percobaannya langsung gagal
+            conn.execute(
+                """UPDATE jobs SET status = ?, error = 'lease kadaluarsa', lease_owner = NULL,
+                       lease_token = NULL, lease_expires_at = NULL, updated_at = ?
+                   WHERE status = ? AND lease_expires_at < ? AND attempts >= max_attempts""",
+                (STATUS_FAILED, now, STATUS_LEASED, now),
+            )
+            row = conn.execute(
+                """SELECT * FROM jobs
+                   WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires_at < ?)
+                   ORDER BY available_at, id LIMIT 1""",
+                (STATUS_PENDING, now, STATUS_LEASED, now),
+            ).fetchone()
+            if not row:
+                return None
+            token = uuid.uuid4().hex
+            conn.execute(
+                """UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?,
+                       lease_token = ?, lease_expires_at = ?, updated_at = ?
+                   WHERE id = ?""",
+                (STATUS_LEASED, worker_id, token, now + lease_seconds, now, row["id"]),
+            )
+            job = dict(row)
+            job.update(
+                status=STATUS_LEASED,
+                attempts=row["attempts"] + 1,
+                lease_owner=worker_id,
+                lease_token=token,
+                lease_expires_at=now + lease_seconds,
+            )
+            return job
+        return self._write(op)
+
+    def _update_leased(self, job_id, lease_token, assignments, params):
+        def op(conn):
+            cursor = conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE id = ? AND status = ? AND lease_token = ?",
+                (*params, time.time(), job_id, STATUS_LEASED, lease_token),
+            )
+            return cursor.rowcount == 1
+        return self._write(op)
+
+    def heartbeat(self, job_id, lease_token, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return self._update_leased(
+            job_id, lease_token, "lease_expires_at = ?", (time.time() + lease_seconds,)
+        )
+
+    def complete(self, job_id, lease_token, result=None):
+        return self._update_leased(
+            job_id,
+            lease_token,
+            "status = ?, result = ?, error = NULL, lease_token = NULL, lease_expires_at = NULL",
+            (STATUS_DONE, json.dumps(result, ensure_ascii=False) if result is not None else None),
+        )
+
+    def fail(self, job_id, lease_token, error, retry_delay=DEFAULT_RETRY_DELAY):
+        return self._update_leased(
+            job_id,
+            lease_token,
+            """status = CASE WHEN attempts < max_attempts THEN ? ELSE ? END,
+               available_at = ?, error = ?, lease_token = NULL, lease_expires_at = NULL""",
+            (STATUS_PENDING, STATUS_FAILED, time.time() + retry_delay, str(error)),
+        )
+
+    def stats(self):
+        conn = self._connect()
+        try:
+            counts = {status: 0 for status in (STATUS_PENDING, STATUS_LEASED, STATUS_DONE, STATUS_FAILED)}
+            for row in conn.execute("SELECT status, COUNT(*) AS total FROM jobs GROUP BY status"):
+                counts[row["status"]] = row["total"]
+            return counts
+        finally:
+            conn.close()
+
+    def next_available_at(self):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT MIN(available_at) AS next_at FROM jobs WHERE status = ?", (STATUS_PENDING,)
+            ).fetchone()
+            return row["next_at"]
+        finally:
+            conn.close()
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _heartbeat_loop(queue, job, lease_seconds, stop_event):
+    interval = max(lease_seconds / 3, 0.1)
+    while not stop_event.wait(interval):
+        try:
+            if not queue.heartbeat(job["id"], job["lease_token"], lease_seconds):
+                print(f"⚠️  Lease job #{job['id']} hilang, job mungkin diambil worker lain")
+                return
+        except sqlite3.Error as e:
+            print(f"⚠️  Heartbeat job #{job['id']} gagal: {e}")
+
+
+def _scrape_child(scrape_fn, job, conn):
+    """Dijalankan di proses anak: kirim hasil atau pesan error lewat pipe"""
+    try:
+        conn.send(("ok", scrape_fn(job)))
+    except BaseException as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def _scrape_with_deadline(scrape_fn, job, max_job_seconds):
+    """
+    Jalankan scrape_fn(job) di proses anak yang dihentikan paksa setelah max_job_seconds,
+    sehingga scraper yang macet tidak memblokir worker dan tidak menulis hasil terlambat.
+    scrape_fn dan hasilnya harus bisa di-pickle.
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_scrape_child, args=(scrape_fn, job, sender))
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(max_job_seconds):
+            raise TimeoutError(f"melewati batas {max_job_seconds} detik, proses scraper dihentikan")
+        try:
+            status, value = receiver.recv()
+        except EOFError:
+            process.join()
+            raise RuntimeError(f"proses scraper berhenti tanpa hasil (exit code {process.exitcode})")
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        receiver.close()
+    if status == "error":
+        raise RuntimeError(value)
+    return value
+
+
+def run_worker(
+    queue,
+    scrape_fn,
+    worker_id=None,
+    lease_seconds=DEFAULT_LEASE_SECONDS,
+    max_job_seconds=DEFAULT_MAX_JOB_SECONDS,
+    poll_interval=5,
+    max_jobs=None,
+    exit_when_empty=False,
+    retry_delay=DEFAULT_RETRY_DELAY,
+):
+    """
+    Loop worker: claim job -> scrape_fn(job) -> laporkan hasil.
+    scrape_fn mengembalikan dict ringkasan hasil; exception atau None dianggap gagal.
+    Selama scraping berjalan, lease diperpanjang oleh thread heartbeat.
+    max_job_seconds: scrape_fn dijalankan di proses anak yang dihentikan setelah batas ini
+    dan job dilaporkan gagal (diulang sesuai max_attempts); None = tanpa batas, di proses ini.
+    exit_when_empty: berhenti hanya jika tidak ada job pending maupun leased.
+    """
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    print(f"👷 Worker {worker_id} siap (queue: {getattr(queue, 'path', queue)})")
+
+    while max_jobs is None or processed < max_jobs:
+        job = queue.claim(worker_id, lease_seconds)
+        if not job:
+            stats = queue.stats()
+            if exit_when_empty and not stats[STATUS_PENDING] and not stats[STATUS_LEASED]:
+                print("✅ Queue kosong, worker berhenti")
+                break
+            # Tunggu sampai job retry berikutnya tersedia (atau poll lagi untuk lease yang kadaluarsa)
+            wait = poll_interval
+            next_at = queue.next_available_at()
+            if next_at is not None:
+                wait = min(poll_interval, max(next_at - time.time(), 0))
+            time.sleep(wait)
+            continue
+
+        print(f"🚀 Job #{job['id']} (percobaan {job['attempts']}/{job['max_attempts']}): {job['url']}")
+        stop_event = threading.Event()
+        heartbeat = threading.Thread(
+            target=_heartbeat_loop,
+            args=(queue, job, lease_seconds, stop_event),
+            daemon=True,
+        )
+        heartbeat.start()
+        try:
+            if max_job_seconds is None:
+                result = scrape_fn(job)
+            else:
+                result = _scrape_with_deadline(scrape_fn, job, max_job_seconds)
+            if result is None:
+                raise RuntimeError("scraper tidak mengembalikan hasil")
+        except Exception as e:
+            stop_event.set()
+            heartbeat.join()
+            print(f"❌ Job #{job['id']} gagal: {e}")
+            queue.fail(job["id"], job["lease_token"], e, retry_delay)
+        else:
+            stop_event.set()
+            heartbeat.join()
+            if queue.complete(job["id"], job["lease_token"], result):
+                print(f"✅ Job #{job['id']} selesai")
+            else:
+                print(f"⚠️  Job #{job['id']} selesai tapi lease sudah hilang, hasil tidak dicatat")
+        processed += 1
+
+    return processed
@@ -0,0 +1,511 @@
+import json
+import re
+import time
+from functools import lru_cache
+
+import requests
+from requests.exceptions import RequestException
+
+
+def extract_text(item):
+    """Helper untuk mengambil teks dari struktur YouTube (runs/simpleText)"""
+    if not item:
+        return ""
+    if isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        if "simpleText" in item:
+            return item["simpleText"]
+        if "runs" in item:
+            return "".join(part.get("text", "") for part in item["runs"] if isinstance(part, dict))
+    if isinstance(item, list):
+        return "".join(extract_text(part) for part in item)
+    return ""
+
+
+# Sufiks singkatan angka per bahasa (dipilih dari `hl` pada INNERTUBE_CONTEXT)
+COUNT_FORMATS = {
+    "en": {"suffixes": {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}},
+    "id": {"suffixes": {"rb": 1_000, "jt": 1_000_000, "m": 1_000_000_000, "t": 1_000_000_000_000}},
+}
+DEFAULT_COUNT_LOCALE = "en"
+COUNT_PATTERN = re.compile(r"(\d[\d.,]*)\s*([^\W\d_]+)?")
+COUNT_SEPARATOR_PATTERN = re.compile(r"[.,]")
+# Spasi sempit/non-breaking di antara grup ribuan ('1\u202f234' di locale seperti fr)
+COUNT_SPACE_GROUP_PATTERN = re.compile(r"(?<=\d)[\u202f\xa0](?=\d{3}(?!\d))")
+
+
+def count_locale_from_hl(hl):
+    """Ubah kode bahasa `hl` (mis. 'id', 'en-GB') menjadi key COUNT_FORMATS"""
+    lang = str(hl or "").split("-")[0].split("_")[0].lower()
+    return lang if lang in COUNT_FORMATS else DEFAULT_COUNT_LOCALE
+
+
+@lru_cache(maxsize=4096)
+def _parse_count_text(text, hl):
+    """
+    Parsing teks jumlah mentah; di-cache per (teks, hl) karena variasi input sangat sedikit.
+    Arti '.' dan ',' ditentukan dari bentuk angkanya, bukan dari locale, sehingga
+    teks dari locale lain tetap benar ('1,000' saat hl='id' -> 1000):
+    - dengan sufiks singkatan (K, rb, jt, ...) pemisah terakhir adalah desimal
+      ('1.2K', '1,2 rb');
+    - tanpa sufiks, grup 3 digit adalah pemisah ribuan ('1,234', '1.234');
+      selain itu pemisah terakhir dianggap desimal ('12,3').
+    Spasi sempit/non-breaking di antara grup 3 digit juga pemisah ribuan ('1\u202f234');
+    spasi lain diperlakukan sebagai spasi biasa ('1,2\xa0rb').
+    Hasil dibulatkan ke integer terdekat ('12,3' -> 12).
+    """
+    suffixes = COUNT_FORMATS[count_locale_from_hl(hl)]["suffixes"]
+    cleaned = COUNT_SPACE_GROUP_PATTERN.sub("", text)
+    cleaned = cleaned.replace("\u202f", " ").replace("\xa0", " ").strip().lower()
+    match = COUNT_PATTERN.search(cleaned)
+    if not match:
+        return 0
+    number, suffix = match.group(1).rstrip(".,"), match.group(2)
+    multiplier = 1
+    if suffix:
+        multiplier = suffixes.get(suffix) or COUNT_FORMATS[DEFAULT_COUNT_LOCALE]["suffixes"].get(suffix, 1)
+
+    groups = COUNT_SEPARATOR_PATTERN.split(number)
+    if len(groups) == 1:
+        amount = float(number)
+    elif multiplier == 1 and all(len(group) == 3 for group in groups[1:]):
+        amount = float("".join(groups))
+    else:
+        amount = float(f"{''.join(groups[:-1])}.{groups[-1]}")
+    return int(amount * multiplier + 0.5)
+
+
+def normalize_count_value(value, hl=DEFAULT_COUNT_LOCALE):
+    """Mengubah teks jumlah (mis. '1.2K likes', '1,2 rb', '12 balasan') menjadi integer"""
+    if value is None:
+        return 0
+    if isinstance(value, int):
+        return value
+    return _parse_count_text(str(value), hl)
+
+
+def extract_comment_entities(framework_updates):
+    """Mengambil mapping commentKey -> payload (dipakai untuk commentViewModel)"""
+    entities = {}
+    if not framework_updates:
+        return entities
+    batch = framework_updates.get("entityBatchUpdate", {})
+    for mutation in batch.get("mutations", []):
+        payload = mutation.get("payload", {})
+        entity = payload.get("commentEntityPayload")
+        if entity and entity.get("key"):
+            entities[entity["key"]] = entity
+    return entities
+
+
+def _find_token_in_structure(node):
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            command = current.get("continuationCommand")
+            if command and command.get("token"):
+                return command["token"]
+            for key in ("nextContinuationData", "reloadContinuationData"):
+                cont = current.get(key)
+                if isinstance(cont, dict) and cont.get("continuation"):
+                    return cont["continuation"]
+            if "continuationEndpoint" in current:
+                endpoint = current["continuationEndpoint"]
+                if isinstance(endpoint, dict):
+                    command = endpoint.get("continuationCommand")
+                    if command and command.get("token"):
+                        return command["token"]
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    return None
+
+
+def extract_comment_continuation(initial_data):
+    """Cari continuation token pertama untuk panel komentar"""
+    if not isinstance(initial_data, (dict, list)):
+        return None
+    stack = [initial_data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            panel = node.get("engagementPanelSectionListRenderer")
+            if panel:
+                identifier = panel.get("panelIdentifier") or panel.get("targetId")
+                if identifier == "engagement-panel-comments-section":
+                    token = _find_token_in_structure(panel)
+                    if token:
+                        return token
+            target_id = node.get("targetId") or node.get("panelIdentifier")
+            if target_id == "engagement-panel-comments-section":
+                token = _find_token_in_structure(node)
+                if token:
+                    return token
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return None
+
+
+def extract_next_continuation(data):
+    """Ambil continuation token selanjutnya dari response API"""
+    if not isinstance(data, dict):
+        return None
+    endpoints = data.get("onResponseReceivedEndpoints", [])
+    for endpoint in endpoints:
+        for key in ("reloadContinuationItemsCommand", "appendContinuationItemsAction"):
+            if key in endpoint:
+                token = _find_token_in_structure(endpoint[key])
+                if token:
+                    return token
+    return _find_token_in_structure(data)
+
+
+def parse_legacy_comment(thread_renderer, index, hl=DEFAULT_COUNT_LOCALE):
+    comment_renderer = thread_renderer.get("comment", {}).get("commentRenderer")
+    if not comment_renderer:
+        return None
+    text = extract_text(comment_renderer.get("contentText"))
+    if not text:
+        return None
+    author = extract_text(comment_renderer.get("authorText")) or "Unknown"
+    published = extract_text(comment_renderer.get("publishedTimeText")) or "Unknown"
+    like_text = (
+        extract_text(comment_renderer.get("voteCount")) or comment_renderer.get("likeCount")
+    )
+    replies_renderer = thread_renderer.get("replies", {}).get("commentRepliesRenderer")
+    replies_text = None
+    if replies_renderer:
+        replies_text = (
+            extract_text(replies_renderer.get("moreText"))
+            or extract_text(replies_renderer.get("viewReplies"))
+            or replies_renderer.get("replyCount")
+        )
+    comment_id = comment_renderer.get("commentId")
+    return {
+        "index": index,
+        "comment_id": comment_id,
+        "author": author,
+        "text": text.strip(),
+        "published": published,
+        "likes": normalize_count_value(like_text, hl),
+        "replies_count": normalize_count_value(replies_text, hl),
+    }
+
+
+def parse_view_model_comment(thread_renderer, entities, index, hl=DEFAULT_COUNT_LOCALE):
+    view_model = thread_renderer.get("commentViewModel", {}).get("commentViewModel", {})
+    comment_key = view_model.get("commentKey")
+    if not comment_key:
+        return None
+    entity = entities.get(comment_key)
+    if not entity:
+        return None
+    props = entity.get("properties", {})
+    text = props.get("content", {}).get("content")
+    if not text:
+        return None
+    author = props.get("authorButtonA11y") or entity.get("author", {}).get("displayName") or "Unknown"
+    published = props.get("publishedTime") or "Unknown"
+    toolbar = entity.get("toolbar", {})
+    like_hint = toolbar.get("likeCountA11y") or toolbar.get("likeCountNotliked") or toolbar.get("likeCountLiked")
+    replies_hint = toolbar.get("replyCount")
+    comment_id = props.get("commentId")
+    return {
+        "index": index,
+        "comment_id": comment_id,
+        "author": author,
+        "text": text.strip(),
+        "published": published,
+        "likes": normalize_count_value(like_hint, hl),
+        "replies_count": normalize_count_value(replies_hint, hl),
+    }
+
+
+def parse_comment_from_thread(thread_renderer, entities, index, hl=DEFAULT_COUNT_LOCALE):
+    legacy = parse_legacy_comment(thread_renderer, index, hl)
+    if legacy:
+        return legacy
+    return parse_view_model_comment(thread_renderer, entities, index, hl)
+
+
+def parse_comment_response(data, entities, existing_total, seen_ids, hl=DEFAULT_COUNT_LOCALE):
+    items = []
+    for endpoint in data.get("onResponseReceivedEndpoints", []):
+        if "reloadContinuationItemsCommand" in endpoint:
+            items.extend(endpoint["reloadContinuationItemsCommand"].get("continuationItems", []))
+        if "appendContinuationItemsAction" in endpoint:
+            items.extend(endpoint["appendContinuationItemsAction"].get("continuationItems", []))
+    parsed = []
+    for item in items:
+        renderer = item.get("commentThreadRenderer")
+        if not renderer:
+            continue
+        comment = parse_comment_from_thread(renderer, entities, existing_total + len(parsed) + 1, hl)
+        if not comment:
+            continue
+        dedupe_key = comment.get("comment_id") or f"{comment['author']}::{comment['text']}"
+        if dedupe_key in seen_ids:
+            continue
+        seen_ids.add(dedupe_key)
+        parsed.append(comment)
+    return parsed
+
+
+WATCH_URL = "https://www.youtube.com/watch?v={}"
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36 Edg/131.0.0.0"
+)
+REQUEST_TIMEOUT = 30
+VIDEO_ID_PATTERN = re.compile(r"[a-zA-Z0-9_-]{11}")
+
+# Alasan berhenti, dikembalikan iter_comments sebagai nilai return generator
+STOP_END = "end"
+STOP_TARGET = "target"
+STOP_MAX_PAGES = "max_pages"
+STOP_MAX_BYTES = "max_bytes"
+STOP_MAX_SECONDS = "max_seconds"
+STOP_CANCELLED = "cancelled"
+STOP_NO_NEW_COMMENTS = "no_new_comments"
+
+
+class CommentFetchError(RuntimeError):
+    """Komentar tidak bisa diambil: konfigurasi halaman gagal dibaca atau request API terus gagal"""
+
+
+def _silent(*args, **kwargs):
+    pass
+
+
+def video_watch_url(video):
+    """Terima URL atau video ID, kembalikan URL watch YouTube"""
+    video = video.strip()
+    if VIDEO_ID_PATTERN.fullmatch(video):
+        return WATCH_URL.format(video)
+    return video
+
+
+def read_innertube_config(driver):
+    """Baca API key, context, ytInitialData, dan user agent dari halaman di browser"""
+    try:
+        return {
+            "api_key": driver.run_js(
+                "return (window.ytcfg && window.ytcfg.get) ? window.ytcfg.get('INNERTUBE_API_KEY') : null;"
+            ),
+            "context": driver.run_js(
+                "return (window.ytcfg && window.ytcfg.get) ? window.ytcfg.get('INNERTUBE_CONTEXT') : null;"
+            ),
+            "initial_data": driver.run_js("return window.ytInitialData || null;"),
+            "user_agent": driver.run_js("return navigator.userAgent;"),
+            "page_bytes": 0,
+        }
+    except Exception as exc:
+        raise CommentFetchError(f"Gagal membaca konfigurasi YouTube: {exc}") from exc
+
+
+def _decode_json_at(html, start):
+    try:
+        return json.JSONDecoder().raw_decode(html, start)[0]
+    except ValueError:
+        return None
+
+
+def fetch_innertube_config(session, url, timeout=REQUEST_TIMEOUT):
+    """Sama seperti read_innertube_config, tapi tanpa browser: parsing HTML halaman watch"""
+    headers = {"User-Agent": DEFAULT_USER_AGENT, "Accept-Language": "en-US,en;q=0.9"}
+    try:
+        response = session.get(url, headers=headers, timeout=timeout)
+        response.raise_for_status()
+    except RequestException as req_err:
+        raise CommentFetchError(f"Gagal membuka halaman video: {req_err}") from req_err
+
+    html = response.text
+    ytcfg = {}
+    for match in re.finditer(r"ytcfg\.set\(\s*(?=\{)", html):
+        value = _decode_json_at(html, match.end())
+        if isinstance(value, dict):
+            ytcfg.update(value)
+
+    initial_data = None
+    match = re.search(r"(?:var\s+ytInitialData|window\[\"ytInitialData\"\])\s*=\s*(?=\{)", html)
+    if match:
+        initial_data = _decode_json_at(html, match.end())
+
+    return {
+        "api_key": ytcfg.get("INNERTUBE_API_KEY"),
+        "context": ytcfg.get("INNERTUBE_CONTEXT"),
+        "initial_data": initial_data,
+        "user_agent": DEFAULT_USER_AGENT,
+        "page_bytes": len(response.content),
+    }
+
+
+def iter_comments(
+    video,
+    driver=None,
+    target_count=None,
+    max_seconds=None,
+    max_pages=None,
+    max_bytes=None,
+    cancel_event=None,
+    session=None,
+    verbose=False,
+):
+    """
+    Generator komentar per batch (satu list per halaman continuation).
+    video: URL atau video ID. Jika driver diberikan, konfigurasi dibaca dari browser;
+    jika tidak, halaman watch diambil langsung via requests.
+    Berhenti saat komentar habis, target_count tercapai, budget max_seconds /
+    max_pages / max_bytes terlampaui, atau cancel_event (threading.Event) di-set.
+    max_bytes menghitung HTML halaman watch dan semua response continuation.
+    Nilai return generator (StopIteration.value / yield from) adalah alasan berhenti
+    (konstanta STOP_*). CommentFetchError jika konfigurasi halaman tidak bisa dibaca
+    atau request/parsing API gagal berturut-turut sampai batas percobaan.
+    Output ke stdout hanya jika verbose=True.
+    """
+    url = video_watch_url(video)
+    started = time.monotonic()
+    log = print if verbose else _silent
+
+    def remaining_seconds():
+        if max_seconds is None:
+            return None
+        return max_seconds - (time.monotonic() - started)
+
+    def request_timeout():
+        remaining = remaining_seconds()
+        return REQUEST_TIMEOUT if remaining is None else max(min(REQUEST_TIMEOUT, remaining), 0.1)
+
+    own_session = session is None
+    if own_session:
+        session = requests.Session()
+
+    try:
+        if driver is not None:
+            config = read_innertube_config(driver)
+        else:
+            config = fetch_innertube_config(session, url, request_timeout())
+        missing = [key for key in ("api_key", "context", "initial_data") if not config[key]]
+        if missing:
+            raise CommentFetchError(f"Konfigurasi YouTube tidak lengkap ({', '.join(missing)}): {url}")
+
+        continuation = extract_comment_continuation(config["initial_data"])
+        if not continuation:
+            raise CommentFetchError(f"Token komentar tidak ditemukan (komentar dinonaktifkan?): {url}")
+
+        context = config["context"]
+        api_endpoint = f"https://www.youtube.com/youtubei/v1/next?key={config['api_key']}"
+        headers = {
+            "Content-Type": "application/json",
+            "Origin": "https://www.youtube.com",
+            "Referer": url,
+            "User-Agent": config["user_agent"] or "Mozilla/5.0",
+            "X-YouTube-Client-Name": str(context.get("client", {}).get("clientName", "WEB")),
+            "X-YouTube-Client-Version": context.get("client", {}).get("clientVersion", "2.20251109.10.00"),
+        }
+        hl = context.get("client", {}).get("hl", DEFAULT_COUNT_LOCALE)
+
+        total = 0
+        # HTML halaman watch ikut dihitung dalam budget max_bytes
+        bytes_read = config["page_bytes"]
+        seen_ids = set()
+        entities_cache = {}
+        token = continuation
+        page = 0
+        consecutive_empty = 0
+        max_consecutive_empty = 5  # Tingkatkan toleransi
+
+        while token:
+            # Cek budget & pembatalan sebelum setiap request
+            if cancel_event is not None and cancel_event.is_set():
+                log("  ⏹️  Dibatalkan")
+                return STOP_CANCELLED
+            if max_pages is not None and page >= max_pages:
+                log(f"  ⏹️  Batas {max_pages} halaman tercapai")
+                return STOP_MAX_PAGES
+            if max_bytes is not None and bytes_read >= max_bytes:
+                log(f"  ⏹️  Batas {max_bytes:,} byte tercapai")
+                return STOP_MAX_BYTES
+            remaining = remaining_seconds()
+            if remaining is not None and remaining <= 0:
+                log(f"  ⏹️  Batas waktu {max_seconds} detik tercapai")
+                return STOP_MAX_SECONDS
+
+            page += 1
+            payload = {
+                "context": context,
+                "continuation": token,
+            }
+            try:
+                response = session.post(api_endpoint, headers=headers, json=payload, timeout=request_timeout())
+                response.raise_for_status()
+            except RequestException as req_err:
+                log(f"⚠️  Permintaan komentar batch {page} gagal: {req_err}")
+                # Jangan langsung break, coba lanjut dengan token berikutnya
+                consecutive_empty += 1
+                if consecutive_empty >= max_consecutive_empty:
+                    raise CommentFetchError(
+                        f"Permintaan komentar gagal {consecutive_empty}x berturut-turut: {req_err}"
+                    ) from req_err
+                continue
+
+            bytes_read += len(response.content)
+            try:
+                data = response.json()
+            except ValueError as parse_err:
+                log(f"⚠️  Response komentar tidak valid: {parse_err}")
+                consecutive_empty += 1
+                if consecutive_empty >= max_consecutive_empty:
+                    raise CommentFetchError(
+                        f"Response komentar tidak valid {consecutive_empty}x berturut-turut: {parse_err}"
+                    ) from parse_err
+                continue
+
+            # Update entities cache
+            entities_cache.update(extract_comment_entities(data.get("frameworkUpdates")))
+
+            # Parse comments dari response
+            new_comments = parse_comment_response(data, entities_cache, total, seen_ids, hl)
+
+            if new_comments:
+                total += len(new_comments)
+                log(f"  📥 API batch {page}: +{len(new_comments)} komentar (total {total})")
+                consecutive_empty = 0  # Reset counter
+                yield new_comments
+
+                # Jika ada target count dan sudah tercapai, stop
+                if target_count and total >= target_count:
+                    log(f"  ✅ Target {target_count:,} komentar tercapai!")
+                    return STOP_TARGET
+            else:
+                consecutive_empty += 1
+                if consecutive_empty <= 2:
+                    log(f"  ⏭️  API batch {page}: tidak ada komentar baru, mencoba lanjut...")
+                else:
+                    log(f"  ⚠️  API batch {page}: tidak ada komentar baru ({consecutive_empty}x)")
+
+                # Jika sudah beberapa kali berturut-turut tidak ada komentar baru, stop
+                if consecutive_empty >= max_consecutive_empty:
+                    log(f"  ⚠️  Tidak ada komentar baru setelah {max_consecutive_empty}x percobaan, berhenti.")
+                    return STOP_NO_NEW_COMMENTS
+
+            # Ambil continuation token untuk batch selanjutnya
+            next_token = extract_next_continuation(data)
+
+            if not next_token:
+                log("  ✅ Semua komentar telah diambil (tidak ada continuation token)")
+                return STOP_END
+
+            # Pastikan token berbeda dari sebelumnya (cegah infinite loop)
+            if next_token == token:
+                log("  ⚠️  Token sama, kemungkinan sudah tidak ada komentar lagi")
+                return STOP_END
+
+            token = next_token
+        return STOP_END
+    finally:
+        if own_session:
+            session.close()